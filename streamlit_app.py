@@ -1,8 +1,13 @@
 # Load required libraries
+# pandas, openpyxl and plotly are imported on first use (see import_pandas / import_plotly)
+import time
+script_start = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
 import os
-import plotly.express as px
+import sys
+import threading
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 
 # Set page configuration
 st.set_page_config(
@@ -11,6 +16,234 @@ st.set_page_config(
     layout="wide"
 )
 
+# Excel file path
+file_path = "Knitting Machine Dashboard.xlsx"
+
+# Sheets used by the dashboard (all other sheets in the workbook are skipped)
+dashboard_sheets = ["Machines", "Advantis Machines", "OUT"]
+
+# Columns shown in the Data Table and the drill-down machine lists (blank trailing columns are hidden)
+table_columns = {"Machines": "A:H", "Advantis Machines": "A:G", "OUT": "A:F"}
+
+# Process wide startup timings, shared by every session
+@st.cache_resource(show_spinner=False)
+def startup_metrics():
+    return {}
+
+# Set once the first session has rendered, the warm-up waits for it so it doesn't compete with that render
+@st.cache_resource(show_spinner=False)
+def first_render_done():
+    return threading.Event()
+
+# Import pandas (and the openpyxl engine it uses for .xlsx) only when data is needed
+# Timed only by the thread that actually runs the import (a module being imported is already in sys.modules)
+def import_pandas():
+    first_import = "pandas" not in sys.modules
+    start = time.perf_counter()
+    import pandas as pd
+    import openpyxl
+    if first_import:
+        startup_metrics().setdefault("pandas_import", time.perf_counter() - start)
+    return pd
+
+# Import plotly express only when a chart is drawn
+def import_plotly():
+    first_import = "plotly.express" not in sys.modules
+    start = time.perf_counter()
+    import plotly.express as px
+    if first_import:
+        startup_metrics().setdefault("plotly_import", time.perf_counter() - start)
+    return px
+
+# Modification time of the workbook, used as cache key so edits to the file are picked up
+def workbook_version():
+    return os.path.getmtime(file_path)
+
+# Parse the workbook once per version and keep it in memory
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_workbook(version):
+    pd = import_pandas()
+    start = time.perf_counter()
+    sheets = pd.read_excel(file_path, sheet_name=dashboard_sheets)
+    startup_metrics().setdefault("workbook_parse", time.perf_counter() - start)
+    return sheets
+
+# Limit a sheet to a range of Excel columns (e.g. "A:H" -> first 8 columns)
+def select_columns(df, usecols=None):
+    if usecols:
+        first, last = usecols.split(":")
+        df = df.iloc[:, ord(first) - ord("A"):ord(last) - ord("A") + 1]
+    return df
+
+# Return a copy of one sheet, optionally limited to a range of columns
+def load_sheet(sheet_name, usecols=None):
+    return select_columns(load_workbook(workbook_version())[sheet_name], usecols).copy()
+
+# Keep only rows matching the given status, types and location
+def filter_machines(df, status=None, types=None, location_column=None, location=None):
+    if status is not None:
+        df = df[df["Status"] == status]
+    if types is not None:
+        df = df[df["Type"].isin(types)]
+    if location is not None:
+        df = df[df[location_column] == location]
+    return df
+
+# Machine count per Type
+@st.cache_data(show_spinner=False)
+def type_counts(version, sheet_name, status=None):
+    df = filter_machines(load_sheet(sheet_name), status=status)
+    return df["Type"].value_counts()
+
+# Machine count per Diameter and Type
+@st.cache_data(show_spinner=False)
+def diameter_type_counts(version, sheet_name, status=None, types=None, location_column=None, location=None):
+    df = filter_machines(load_sheet(sheet_name), status, types, location_column, location)
+    return df.groupby(["Diameter","Type"]).size().reset_index(name="Count")
+
+# Hierarchical rollup of one sheet: (Diameter, Type) -> (Status, Location) -> row ids
+# Built with a single groupby per workbook version, so every drill-down step is a dictionary lookup
+# Kept in st.cache_resource (not copied on each rerun), callers must treat it as read-only
+# Bounded to the four sheet/status variants of one workbook version
+@st.cache_resource(show_spinner=False, max_entries=4)
+def diameter_rollups(version, sheet_name, status=None, location_column="Location Group"):
+    df = filter_machines(load_sheet(sheet_name), status=status)
+    levels = [column for column in ["Status", location_column] if column in df.columns]
+    cells = {}
+    for group, row_ids in df.groupby(["Diameter","Type"] + levels, dropna=False).groups.items():
+        cells.setdefault((group[0], group[1]), {})[tuple(group[2:])] = list(row_ids)
+    return {"levels": levels, "cells": cells}
+
+# Machine types selected by default in the Overview chart
+def default_overview_types():
+    return tuple(load_sheet("Machines")["Type"].unique()[:3])
+
+# Overview bar chart by Diameter and Type
+@st.cache_data(show_spinner=False)
+def overview_figure(version, selected_types):
+    px = import_plotly()
+    count_data = diameter_type_counts(version, "Machines", types=selected_types)
+
+    #Create bar chart
+    fig = px.bar(count_data,x="Diameter",y="Count",color="Type",barmode="group",
+    title="Machine Count by Diameter and Type",
+    labels={"Diameter":"Diameter","Count":"Machine Count"},
+    category_orders={"Diameter":sorted(count_data["Diameter"].unique())}
+    )
+
+    #Center the chart title
+    fig.update_layout(title_x=0.37)
+
+    #Customized the chart
+    fig.update_layout(xaxis_title="Diameter",yaxis_title="Number of Machines",
+    showlegend = True,bargap=0.2,bargroupgap=0.1,plot_bgcolor='#262730',paper_bgcolor='#262730')
+
+    #Add data labels on bars
+    fig.update_traces(texttemplate="%{y}",
+    textposition="outside")
+
+    return fig
+
+# Drill-down for a clicked Diameter/Type bar: breakdown by Status and location, machine list and Data Table link
+def show_diameter_drill_down(event, sheet_name, status=None, location_column="Location Group", location=None, key="drill"):
+    points = event.selection.points if event else []
+    if not points:
+        st.caption("Click a bar to see the machines behind it")
+        return
+
+    diameter = points[0]["x"]
+    machine_type = points[0]["legendgroup"]
+
+    # Look up the clicked cell in the precomputed rollup
+    rollups = diameter_rollups(workbook_version(), sheet_name, status, location_column)
+    levels = rollups["levels"]
+    cell = rollups["cells"].get((diameter, machine_type), {})
+    if location is not None:
+        cell = {leaf: row_ids for leaf, row_ids in cell.items() if leaf[-1] == location}
+
+    if not cell:
+        st.info("No machines found for the selected bar")
+        return
+
+    pd = import_pandas()
+    px = import_plotly()
+
+    st.markdown("<h3 style='text-align:center;font-size:20px;'>🔎 {} Machines with Diameter {}:</h3>".format(machine_type, diameter),unsafe_allow_html=True)
+
+    # Breakdown by Status and location, one row per rollup leaf
+    breakdown = pd.DataFrame([list(leaf) + [len(row_ids)] for leaf, row_ids in cell.items()], columns=levels + ["Count"])
+    breakdown[location_column] = breakdown[location_column].astype(str)
+
+    fig = px.bar(breakdown, x=location_column, y="Count", color="Status" if "Status" in levels else None,
+                 title="Machine Count by {}".format(" and ".join(levels)),
+                 labels={"Count":"Machine Count"})
+    fig.update_layout(title_x=0.5, title_xanchor='center', xaxis_title=location_column, yaxis_title="Number of Machines",
+                      xaxis_type='category', plot_bgcolor='#262730', paper_bgcolor='#262730')
+    fig.update_traces(texttemplate="%{y}", textposition="outside")
+
+    breakdown_event = st.plotly_chart(fig, use_container_width=True, on_select="rerun", selection_mode="points",
+                                      key="{}_{}_{}".format(key, diameter, machine_type))
+
+    # Narrow the machine list to a clicked Status/location bar
+    breakdown_points = breakdown_event.selection.points
+    if breakdown_points:
+        clicked_location = breakdown_points[0]["x"]
+        clicked_status = breakdown_points[0].get("legendgroup") if "Status" in levels else None
+        cell = {leaf: row_ids for leaf, row_ids in cell.items()
+                if str(leaf[-1]) == clicked_location and (clicked_status is None or leaf[0] == clicked_status)}
+
+    row_ids = [row_id for row_ids in cell.values() for row_id in row_ids]
+    machines = select_columns(load_workbook(workbook_version())[sheet_name], table_columns[sheet_name]).loc[row_ids]
+    st.dataframe(machines, use_container_width=True)
+
+    # Link into the Data Table with the matching filters
+    if st.button("Open in Data Table", key="{}_open".format(key), type="primary"):
+        if sheet_name == "Machines":
+            st.session_state.data_table_tab = "MFI Machines"
+            st.session_state.machines_status_filter = status if status is not None else "All"
+            st.session_state.machines_type_filter = machine_type
+            st.session_state.machines_diameter_filter = diameter
+        else:
+            st.session_state.data_table_tab = "Advantis Machines"
+            st.session_state.advantis_type_filter = machine_type
+            st.session_state.advantis_diameter_filter = diameter
+        st.session_state.selected_window = "Data Table"
+        st.rerun()
+
+# Pre-warm the dataset, aggregates and figures once the first session has rendered
+def warm_up():
+    metrics = startup_metrics()
+    first_render_done().wait()
+    start = time.perf_counter()
+    try:
+        version = workbook_version()
+        import_plotly()
+        type_counts(version, "Machines")
+        type_counts(version, "Machines", "Active")
+        type_counts(version, "Machines", "Idle")
+        type_counts(version, "Advantis Machines")
+        overview_figure(version, default_overview_types())
+        # Same arguments as show_diameter_drill_down passes, so the cache keys match
+        diameter_rollups(version, "Machines", None, "Location Group")
+        diameter_rollups(version, "Machines", "Active", "Location Group")
+        diameter_rollups(version, "Machines", "Idle", "Location Group")
+        diameter_rollups(version, "Advantis Machines", None, "Current Location")
+        metrics["warm_up"] = time.perf_counter() - start
+        print("Warm-up finished in {:.2f}s".format(metrics["warm_up"]))
+    except Exception as e:
+        metrics["warm_up_error"] = str(e)
+        print("Warm-up failed after {:.2f}s: {}".format(time.perf_counter() - start, e))
+
+# Start the warm-up once per server process, in the background
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    thread = threading.Thread(target=warm_up, name="dashboard-warm-up", daemon=True)
+    add_script_run_ctx(thread)
+    thread.start()
+    return thread
+
+start_warm_up()
+
 # Add CSS for button styling
 st.markdown("""
 <style>
@@ -74,17 +307,14 @@ for option in menu_options:
         st.session_state.selected_window = option
         st.rerun()
 
-# Excel file path
-file_path = "Knitting Machine Dashboard.xlsx"
-
 try:
     # Display content based on selected window
     if st.session_state.selected_window == "Overview":
         # Load data from Excel file
-        df = pd.read_excel(file_path, sheet_name='Machines')
+        df = load_sheet("Machines")
         
         # Count each machine type
-        machine_counts = df["Type"].value_counts()
+        machine_counts = type_counts(workbook_version(), "Machines")
 
         # Display total machine card
         st.markdown("<h3 style='text-align:center;font-size:20px;'>&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;Total Machines Count:</h3>",unsafe_allow_html=True)
@@ -147,24 +377,8 @@ try:
 
         #Filter data based on selection
         if selected_types:
-            filtered_df = df[df["Type"].isin(selected_types)]
-
-            #Create proper count by diameter and type
-            count_data = filtered_df.groupby(["Diameter","Type"]).size().reset_index(name="Count")
-
-            #Create bar chart
-            fig = px.bar(count_data,x="Diameter",y="Count",color="Type",barmode="group",
-            title="Machine Count by Diameter and Type",
-            labels={"Diameter":"Diameter","Count":"Machine Count"},
-            category_orders={"Diameter":sorted(filtered_df["Diameter"].unique())}
-            )
-
-            #Center the chart title
-            fig.update_layout(title_x=0.37)
-
-            #Customized the chart
-            fig.update_layout(xaxis_title="Diameter",yaxis_title="Number of Machines",
-            showlegend = True,bargap=0.2,bargroupgap=0.1,plot_bgcolor='#262730',paper_bgcolor='#262730')
+            #Create bar chart (cached per selection)
+            fig = overview_figure(workbook_version(), tuple(selected_types))
 
             #Add rounded corners to chart aontainer
             st.markdown("""
@@ -176,19 +390,17 @@ try:
             </style>
             """,unsafe_allow_html=True)
 
-            #Add data labels on bars
-            fig.update_traces(texttemplate="%{y}",
-            textposition="outside")
+            #Display the chart, clicking a bar opens the drill-down below it
+            event = st.plotly_chart(fig, use_container_width=True, on_select="rerun", selection_mode="points", key="overview_chart")
 
-            #Display the chart
-            st.plotly_chart(fig, use_container_width=True)
+            show_diameter_drill_down(event, "Machines", key="overview_drill")
         else:
             st.info("Please select at least one machine type to display the chart")           
     
     elif st.session_state.selected_window == "Running":
         
         #Load data from Excel file
-        df = pd.read_excel(file_path,sheet_name='Machines')
+        df = load_sheet("Machines")
 
         #Remove any rows where status is "Status" (header rows)
         df = df[df["Status"]!="Status"]
@@ -212,7 +424,7 @@ try:
             """.format(len(active_df)), unsafe_allow_html=True)
         
         #Count active machine by Type
-        active_machine_counts = active_df["Type"].value_counts()
+        active_machine_counts = type_counts(workbook_version(), "Machines", "Active")
 
         st.markdown('<div style="margin-top:20px;"></div>',unsafe_allow_html=True)
 
@@ -263,16 +475,16 @@ try:
 
         #Filter data based on selection
         if selected_types:
-            filtered_active_df = active_df[active_df["Type"].isin(selected_types)]
+            px = import_plotly()
 
             #Create count by diameter and type
-            count_data = filtered_active_df.groupby(["Diameter","Type"]).size().reset_index(name="Count")
+            count_data = diameter_type_counts(workbook_version(), "Machines", "Active", tuple(selected_types))
 
             #Create bar chart
             fig = px.bar(count_data,x="Diameter",y="Count",color="Type",barmode="group",
                 title="Active Machine Count by Diameter and Type",
                 labels={"Diameter":"Diameter","Count":"Machine Count"},
-                category_orders={"Diameter":sorted(filtered_active_df["Diameter"].unique())})
+                category_orders={"Diameter":sorted(count_data["Diameter"].unique())})
             
             #Center the chart title
             fig.update_layout(title_x=0.33)
@@ -294,14 +506,16 @@ try:
             </style>
             """,unsafe_allow_html=True)
 
-            st.plotly_chart(fig,use_container_width=True)
+            event = st.plotly_chart(fig,use_container_width=True,on_select="rerun",selection_mode="points",key="running_chart")
+
+            show_diameter_drill_down(event, "Machines", status="Active", key="running_drill")
         else:
             st.info("Please select at least one machine type to display the chart")
 
     elif st.session_state.selected_window == "Parking":
         
         # Load data from Excel file
-        df = pd.read_excel(file_path,sheet_name='Machines')
+        df = load_sheet("Machines")
 
         # Remove any rows where Status is "Status" (header rows)
         df = df[df["Status"] != "Status"]
@@ -325,7 +539,7 @@ try:
             """.format(len(idle_df)), unsafe_allow_html=True)
 
         # Count idle machines by Type
-        idle_machine_counts = idle_df["Type"].value_counts()
+        idle_machine_counts = type_counts(workbook_version(), "Machines", "Idle")
 
         st.markdown('<div style = "Margin-top:20px;"></div>',unsafe_allow_html=True)
 
@@ -384,24 +598,21 @@ try:
                                          options=location_options,
                                          key="parking_location_group")
 
-        # Filter data based on both selections
-        filtered_idle_df = idle_df.copy()
-
-        if selected_type != "All":
-            filtered_idle_df = filtered_idle_df[filtered_idle_df["Type"] == selected_type]
-
-        if selected_location != "All":
-            filtered_idle_df = filtered_idle_df[filtered_idle_df["Location Group"] == selected_location]
+        # Create count by diameter and type based on both selections
+        count_data = diameter_type_counts(workbook_version(), "Machines", "Idle",
+                                          None if selected_type == "All" else (selected_type,),
+                                          "Location Group",
+                                          None if selected_location == "All" else selected_location)
 
         # Check if there's data to display
-        if len(filtered_idle_df) > 0:
-            # Create count by diameter and type
-            count_data = filtered_idle_df.groupby(["Diameter","Type"]).size().reset_index(name="Count")
+        if len(count_data) > 0:
+            px = import_plotly()
+
             # Create bar chart
             fig = px.bar(count_data, x="Diameter", y="Count", color="Type", barmode="group",
                      title="Parking Machine Count by Diameter and Type",
                      labels={"Diameter":"Diameter","Count":"Machine Count"},
-                     category_orders={"Diameter":sorted(filtered_idle_df["Diameter"].unique())})
+                     category_orders={"Diameter":sorted(count_data["Diameter"].unique())})
 
             # Center the chart title
             fig.update_layout(title_x=0.35)
@@ -429,7 +640,11 @@ try:
             """, unsafe_allow_html=True)
         
             # Display the chart
-            st.plotly_chart(fig, use_container_width=True)
+            event = st.plotly_chart(fig, use_container_width=True, on_select="rerun", selection_mode="points", key="parking_chart")
+
+            show_diameter_drill_down(event, "Machines", status="Idle",
+                                     location=None if selected_location == "All" else selected_location,
+                                     key="parking_drill")
         
         else:
             st.info("No data available for the selected filters")
@@ -437,7 +652,7 @@ try:
     elif st.session_state.selected_window == "Advantis":
         
         # Load data from Advantis machines sheet
-        advantis_df = pd.read_excel(file_path, sheet_name='Advantis Machines')
+        advantis_df = load_sheet("Advantis Machines")
     
         # Centered heading
         st.markdown("<h3 style='text-align: center; font-size: 20px;'>&nbsp&nbsp&nbsp&nbspAdvantis Machines Count:</h3>", unsafe_allow_html=True)
@@ -455,7 +670,7 @@ try:
             """.format(len(advantis_df)), unsafe_allow_html=True)
     
         # Count advantis machines by Type
-        advantis_machine_counts = advantis_df["Type"].value_counts()
+        advantis_machine_counts = type_counts(workbook_version(), "Advantis Machines")
 
         st.markdown('<div style = "Margin-top:20px;"></div>',unsafe_allow_html=True)
     
@@ -514,25 +729,21 @@ try:
                                          options=location_options,
                                          key="advantis_current_location")
     
-        # Filter data based on both selections
-        filtered_advantis_df = advantis_df.copy()
-    
-        if selected_type != "All":
-            filtered_advantis_df = filtered_advantis_df[filtered_advantis_df["Type"] == selected_type]
-    
-        if selected_location != "All":
-            filtered_advantis_df = filtered_advantis_df[filtered_advantis_df["Current Location"] == selected_location]
+        # Create count by diameter and type based on both selections
+        count_data = diameter_type_counts(workbook_version(), "Advantis Machines", None,
+                                          None if selected_type == "All" else (selected_type,),
+                                          "Current Location",
+                                          None if selected_location == "All" else selected_location)
     
         # Check if there's data to display
-        if len(filtered_advantis_df) > 0:
-            # Create count by diameter and type
-            count_data = filtered_advantis_df.groupby(["Diameter","Type"]).size().reset_index(name="Count")
+        if len(count_data) > 0:
+            px = import_plotly()
         
             # Create bar chart
             fig = px.bar(count_data, x="Diameter", y="Count", color="Type", barmode="group",
                          title="Advantis Machine Count by Diameter and Type",
                          labels={"Diameter":"Diameter","Count":"Machine Count"},
-                         category_orders={"Diameter":sorted(filtered_advantis_df["Diameter"].unique())})
+                         category_orders={"Diameter":sorted(count_data["Diameter"].unique())})
         
             # Center the chart title
             fig.update_layout(
@@ -563,7 +774,11 @@ try:
             """, unsafe_allow_html=True)
         
             # Display the chart
-            st.plotly_chart(fig, use_container_width=True)
+            event = st.plotly_chart(fig, use_container_width=True, on_select="rerun", selection_mode="points", key="advantis_chart")
+
+            show_diameter_drill_down(event, "Advantis Machines", location_column="Current Location",
+                                     location=None if selected_location == "All" else selected_location,
+                                     key="advantis_drill")
         else:
             st.info("No data available for the selected filters")
     
@@ -573,11 +788,13 @@ try:
         st.markdown("<h3 style = 'text-align:center;font-size:20px;'>📅Data Tables</h3>",unsafe_allow_html=True)
 
         #Create tabs for different sheets
-        tab1, tab2, tab3 = st.tabs(["MFI Machines","Advantis Machines","MFI - OUT"])
+        tab1, tab2, tab3 = st.tabs(["MFI Machines","Advantis Machines","MFI - OUT"],
+                                   default=st.session_state.pop("data_table_tab", None))
 
         with tab1:
             # Load machines sheet
-            machines_df = pd.read_excel(file_path,sheet_name="Machines",usecols="A:H")
+            pd = import_pandas()
+            machines_df = load_sheet("Machines",usecols=table_columns["Machines"])
 
             # Convert service date to date only.(Remove Time)
             if 'Service Date' in machines_df.columns:
@@ -621,7 +838,7 @@ try:
         
         with tab2:
             # Load advantis machines sheet
-            advantis_df = pd.read_excel(file_path,sheet_name="Advantis Machines",usecols="A:G")
+            advantis_df = load_sheet("Advantis Machines",usecols=table_columns["Advantis Machines"])
             st.markdown("<h3 style = 'text-align:center; font-size:20px;'>Advantis Existing Machines Data</h3>",unsafe_allow_html=True)
             
             #Crate filters with columns
@@ -653,7 +870,7 @@ try:
 
         with tab3:
             # Load OUT machines sheet
-            OUT_df = pd.read_excel(file_path,sheet_name="OUT",usecols="A:F")
+            OUT_df = load_sheet("OUT",usecols=table_columns["OUT"])
             st.markdown("<h3 style = 'text-align:center; font-size:20px;'>Machines out from MFI Data</h3>",unsafe_allow_html=True)
             
             #Crate filters with columns
@@ -689,3 +906,29 @@ except FileNotFoundError:
 
 except Exception as e:
     st.error(f"❌ Error loading Excel file: {e}")
+
+# Report import time, warm-up and time-to-first-render
+render_time = time.perf_counter() - script_start
+first_render = "first_render" not in startup_metrics()
+if first_render:
+    startup_metrics()["first_render"] = render_time
+    first_render_done().set()
+
+# Work from a snapshot, the warm-up thread may still be adding timings to the shared dict
+metrics = dict(startup_metrics())
+if first_render:
+    print("Startup timings: " + ", ".join("{} {:.2f}s".format(name, value) for name, value in metrics.items() if name != "warm_up_error"))
+if "first_render" not in st.session_state:
+    st.session_state.first_render = render_time
+
+if "warm_up" in metrics:
+    warm_up_status = "{:.2f}s".format(metrics["warm_up"])
+elif "warm_up_error" in metrics:
+    warm_up_status = "failed ({})".format(metrics["warm_up_error"])
+else:
+    warm_up_status = "running"
+
+st.sidebar.caption("Imports: pandas {:.2f}s · plotly {:.2f}s".format(
+    metrics.get("pandas_import", 0.0), metrics.get("plotly_import", 0.0)))
+st.sidebar.caption("Warm-up: {}".format(warm_up_status))
+st.sidebar.caption("First render (this session): {:.2f}s".format(st.session_state.first_render))